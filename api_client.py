@@ -3,14 +3,83 @@ API Client
 Wrapper for moltbook REST API with authentication and error handling.
 Always uses www.moltbook.com to avoid redirect issues.
 """
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import requests
-from typing import Any, Dict, Optional
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON, falls back to the stdlib
+    orjson = None
+
 
 # Base URL - ALWAYS use www to avoid redirects
 BASE_URL = "https://www.moltbook.com/api/v1"
 
+# Max responses kept by the read cache (oldest evicted first)
+CACHE_MAXSIZE = 128
+
+# Retry policy for 429 responses
+RETRY_BACKOFF_BASE = 1.0  # seconds, doubled per attempt
+RETRY_JITTER = 0.5  # seconds of random spread added to each backoff
+MAX_RETRY_WAIT = 30.0  # longer Retry-After values are raised to the caller
+DEFAULT_RETRY_AFTER = 60  # reported to callers when a 429 gives no usable Retry-After
+
+# Only these are retried; replaying a POST could double-post or double-vote
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _json_loads(body: bytes) -> Any:
+    """Parse a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Serialize a JSON request body."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _retry_after(headers) -> Optional[int]:
+    """
+    Read a Retry-After header.
+    
+    Args:
+        headers: Response headers
+        
+    Returns:
+        Seconds to wait (delta-seconds or HTTP-date form), or None if the
+        header is missing or unparseable
+    """
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0, math.ceil((when - datetime.now(timezone.utc)).total_seconds()))
+
 
 class MoltbookError(Exception):
     """Base exception for moltbook API errors."""
@@ -38,25 +107,59 @@ class NotFoundError(MoltbookError):
 class MoltbookClient:
     """REST API client for moltbook.com."""
     
-    def __init__(self, api_key: str, base_url: str = BASE_URL):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = BASE_URL,
+        cache_ttl: float = 5.0,
+        requests_per_minute: int = 100,
+        max_retries: int = 3
+    ):
         """
         Initialize client.
         
         Args:
             api_key: Moltbook API key for authentication
             base_url: API base URL (defaults to www.moltbook.com)
+            cache_ttl: Seconds to serve repeated feed/profile/status reads
+                from memory (0 disables the cache)
+            requests_per_minute: Client-side request budget, matching the
+                server limit (0 disables self-throttling)
+            max_retries: Retries for rate-limited idempotent requests
+            
+        Raises:
+            ValueError: If max_retries is negative
         """
+        if max_retries < 0:
+            raise ValueError(f"Invalid max_retries: {max_retries}. Must be >= 0")
+        
         self.api_key = api_key
         self.base_url = base_url
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Bumped by clear_cache() so a read that raced a write is not stored
+        self._cache_generation = 0
+        
+        # Token bucket: starts full, refills at requests_per_minute / 60 per second
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self._tokens = float(requests_per_minute)
+        self._last_refill = time.monotonic()
+        self._rate_lock = threading.Lock()
+        
+        # Reuse connections across calls (keep-alive + pooling)
         self.session = requests.Session()
-    
-    def _get_headers(self) -> Dict[str, str]:
-        """Get headers with authorization."""
-        return {
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+        )
+        # Set once; every request sends them from the session
+        self.session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "User-Agent": "Clawdbot-MoltbookSkill/1.0"
-        }
+        })
     
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """
@@ -80,7 +183,9 @@ class MoltbookClient:
             )
         
         if response.status_code == 429:
-            retry_after = int(response.headers.get("Retry-After", 60))
+            retry_after = _retry_after(response.headers)
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER
             raise RateLimitError(
                 f"Rate limited (429): Retry after {retry_after} seconds",
                 retry_after=retry_after
@@ -89,15 +194,17 @@ class MoltbookClient:
         if response.status_code == 404:
             raise NotFoundError(f"Resource not found (404)")
         
+        # Parse the raw bytes directly, skipping requests' charset
+        # guessing and text decode
         if response.status_code >= 400:
             try:
-                error_data = response.json()
+                error_data = _json_loads(response.content)
                 message = error_data.get("error", f"API error: {response.status_code}")
-            except:
+            except (ValueError, AttributeError):
                 message = f"API error: {response.status_code}"
             raise MoltbookError(message)
         
-        return response.json()
+        return _json_loads(response.content)
     
     def request(
         self,
@@ -119,17 +226,99 @@ class MoltbookClient:
             Parsed JSON response
         """
         url = f"{self.base_url}{endpoint}"
+        # Serialized once, outside the retry loop; the session already
+        # sends Content-Type: application/json
+        body = _json_dumps(data) if data is not None else None
         
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=self._get_headers(),
-            json=data,
-            params=params,
-            timeout=30
-        )
+        try:
+            for attempt in range(self.max_retries + 1):
+                self._throttle()
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    data=body,
+                    params=params,
+                    timeout=30
+                )
+                
+                try:
+                    return self._handle_response(response)
+                except RateLimitError:
+                    # Without a usable Retry-After, fall back to plain backoff
+                    # rather than the default reported to callers
+                    wait = _retry_after(response.headers) or 0
+                    if (
+                        method.upper() not in IDEMPOTENT_METHODS
+                        or attempt >= self.max_retries
+                        or wait > MAX_RETRY_WAIT
+                    ):
+                        raise
+                    backoff = RETRY_BACKOFF_BASE * 2 ** attempt
+                    time.sleep(max(wait, backoff + random.uniform(0, RETRY_JITTER)))
+        finally:
+            # Any write may change feeds, scores or profiles
+            if method != "GET":
+                self.clear_cache()
+    
+    def _throttle(self) -> None:
+        """Wait until the client-side rate limit allows another request."""
+        if self.requests_per_minute <= 0:
+            return
+        
+        rate = self.requests_per_minute / 60.0
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.requests_per_minute),
+                self._tokens + (now - self._last_refill) * rate
+            )
+            self._last_refill = now
+            # Reserve a token even if that puts us in debt, then sleep it off
+            # outside the lock so other threads can queue behind us
+            self._tokens -= 1
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+        
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _cached_get(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Make a GET request, reusing a recent response for the same call.
         
-        return self._handle_response(response)
+        Cached responses are shared between callers; treat them as read-only.
+        """
+        if self.cache_ttl <= 0:
+            return self.get(endpoint, params=params)
+        
+        key = (endpoint, frozenset(params.items()) if params else None)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                return entry[1]
+            generation = self._cache_generation
+        
+        data = self.get(endpoint, params=params)
+        
+        with self._cache_lock:
+            if self._cache_generation != generation:
+                # A write cleared the cache mid-request; data may predate it
+                return data
+            self._cache[key] = (time.monotonic(), data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > CACHE_MAXSIZE:
+                self._cache.popitem(last=False)
+        return data
+    
+    def clear_cache(self) -> None:
+        """Drop all cached read responses."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_generation += 1
     
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Make a GET request."""
@@ -147,11 +336,11 @@ class MoltbookClient:
     
     def get_feed(self, sort: str = "hot", limit: int = 25) -> Dict[str, Any]:
         """Get the main feed."""
-        return self.get("/posts", params={"sort": sort, "limit": limit})
+        return self._cached_get("/posts", params={"sort": sort, "limit": limit})
     
     def get_submolt(self, name: str, limit: int = 25) -> Dict[str, Any]:
         """Get posts from a specific submolt."""
-        return self.get(f"/submolts/{name}", params={"limit": limit})
+        return self._cached_get(f"/submolts/{name}", params={"limit": limit})
     
     def get_post(self, post_id: str) -> Dict[str, Any]:
         """Get a single post with comments."""
@@ -186,7 +375,7 @@ class MoltbookClient:
     
     def get_profile(self, agent_name: str) -> Dict[str, Any]:
         """Get an agent's profile."""
-        return self.get(f"/agents/profile/{agent_name}")
+        return self._cached_get(f"/agents/profile/{agent_name}")
     
     def follow(self, agent_id: str) -> Dict[str, Any]:
         """Follow an agent."""
@@ -194,4 +383,4 @@ class MoltbookClient:
     
     def get_status(self) -> Dict[str, Any]:
         """Get current agent status."""
-        return self.get("/agents/status")
+        return self._cached_get("/agents/status")
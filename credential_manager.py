@@ -4,18 +4,42 @@ Isolated credential storage for moltbook skill.
 Credentials stored in ~/.config/moltbook/credentials.json - NEVER in memory files.
 """
 import json
+import os
+import tempfile
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON, falls back to the stdlib
+    orjson = None
 
 DEFAULT_CONFIG_DIR = Path.home() / ".config" / "moltbook"
 
 
+def _json_loads(raw: bytes) -> Any:
+    """Parse the credentials file."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize credentials, indented for hand editing."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+
 class CredentialManager:
     """Manages moltbook credentials in isolated storage."""
     
     def __init__(self, config_dir: Optional[str] = None):
         self.config_dir = Path(config_dir) if config_dir else DEFAULT_CONFIG_DIR
         self.credentials_path = self.config_dir / "credentials.json"
+        # (file stamp, parsed data) from the last load; reparsed only when
+        # the file's mtime/size/inode change
+        self._cache: Optional[Tuple[Tuple[int, int, int], Dict[str, Any]]] = None
     
     def store(
         self,
@@ -45,22 +69,81 @@ class CredentialManager:
             **extra
         }
         
-        self.credentials_path.write_text(json.dumps(data, indent=2))
+        self._write(data)
+    
+    def _write(self, data: Dict[str, Any]) -> None:
+        """
+        Atomically replace the credentials file with data.
+        
+        Written to an owner-only temp file, synced to disk and renamed
+        over the original, so readers never see a half-written file.
+        """
+        # A fresh temp file per write, so concurrent writers never share
+        # one; mkstemp creates it owner-only and the rename keeps the mode
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.config_dir, prefix=".credentials.", suffix=".tmp"
+        )
+        replaced = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_json_dumps(data))
+                f.flush()
+                os.fsync(f.fileno())
+                # Stamp our own file; after the rename the path may already
+                # belong to another writer
+                st = os.fstat(f.fileno())
+            os.replace(tmp_path, self.credentials_path)
+            replaced = True
+        finally:
+            if not replaced:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+        
+        # We know what we just wrote; skip reparsing it on the next load
+        self._cache = ((st.st_mtime_ns, st.st_size, st.st_ino), dict(data))
+    
+    def update(self, **fields) -> None:
+        """
+        Update stored credential fields in a single write.
+        
+        Args:
+            **fields: Fields to set (e.g. mode="engage", claimed=True)
+        """
+        creds = self.load()
+        if creds is None:
+            raise RuntimeError("No credentials found. Store credentials first.")
+        
+        creds.update(fields)
+        self._write(creds)
     
     def load(self) -> Optional[Dict[str, Any]]:
         """
         Load credentials from isolated config file.
         
+        The parsed file is cached and reused until the file changes on disk.
+        
         Returns:
             Credentials dict or None if not found
         """
-        if not self.credentials_path.exists():
-            return None
-        
         try:
-            return json.loads(self.credentials_path.read_text())
-        except (json.JSONDecodeError, IOError):
+            st = self.credentials_path.stat()
+        except OSError:
+            self._cache = None
             return None
+        
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if self._cache is None or self._cache[0] != stamp:
+            try:
+                with open(self.credentials_path, "rb") as f:
+                    data = _json_loads(f.read())
+            except (json.JSONDecodeError, IOError):
+                return None
+            self._cache = (stamp, data)
+        
+        # Callers may modify the result; keep the cached copy intact
+        return dict(self._cache[1])
     
     def set_mode(self, mode: str) -> None:
         """
@@ -72,12 +155,7 @@ class CredentialManager:
         if mode not in ("lurk", "engage", "active"):
             raise ValueError(f"Invalid mode: {mode}. Must be lurk|engage|active")
         
-        creds = self.load()
-        if creds is None:
-            raise RuntimeError("No credentials found. Store credentials first.")
-        
-        creds["mode"] = mode
-        self.credentials_path.write_text(json.dumps(creds, indent=2))
+        self.update(mode=mode)
     
     def get_api_key(self) -> Optional[str]:
         """Get API key for authenticated requests."""
@@ -115,9 +193,4 @@ class CredentialManager:
     
     def set_claimed(self, claimed: bool = True) -> None:
         """Update claimed status."""
-        creds = self.load()
-        if creds is None:
-            raise RuntimeError("No credentials found.")
-        
-        creds["claimed"] = claimed
-        self.credentials_path.write_text(json.dumps(creds, indent=2))
+        self.update(claimed=claimed)
@@ -9,7 +9,7 @@ from typing import Optional, Any, Dict
 from mode_enforcer import ModeEnforcer, Action
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionResult:
     """Result of an engagement action."""
     success: bool
@@ -17,7 +17,7 @@ class ActionResult:
     data: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DraftAction:
     """A drafted action pending human approval."""
     action_type: str  # "comment", "post", "follow"
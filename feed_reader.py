@@ -3,13 +3,16 @@ Feed Reader
 Fetches and summarizes moltbook content with security scanning.
 All content is run through the sanitizer before presentation.
 """
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 
-from content_sanitizer import ContentSanitizer
+from content_sanitizer import ContentSanitizer, get_sanitizer
 
 
-@dataclass
+@dataclass(slots=True)
 class PostSummary:
     """Summarized post with security metadata."""
     id: str
@@ -23,7 +26,7 @@ class PostSummary:
     url: Optional[str] = None
     submolt: Optional[str] = None
     is_suspicious: bool = False
-    suspicious_patterns: List[str] = field(default_factory=list)
+    suspicious_patterns: Tuple[str, ...] = ()
     
     def to_display(self) -> str:
         """Format for human display."""
@@ -43,19 +46,46 @@ class FeedReader:
         self,
         client,  # MoltbookClient instance
         sanitizer: Optional[ContentSanitizer] = None,
-        max_summary_length: int = 300
+        max_summary_length: int = 300,
+        max_workers: int = 8
     ):
         """
         Initialize feed reader.
         
         Args:
             client: MoltbookClient for API calls
-            sanitizer: ContentSanitizer instance (creates default if None)
+            sanitizer: ContentSanitizer instance (shared default if None)
             max_summary_length: Max chars for content summary
+            max_workers: Max concurrent requests for bulk fetches (keep at
+                or below the client's connection pool size)
         """
         self.client = client
-        self.sanitizer = sanitizer or ContentSanitizer()
+        self.sanitizer = sanitizer or get_sanitizer()
         self.max_summary_length = max_summary_length
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the worker pool for bulk fetches, creating it on first use."""
+        executor = self._executor
+        if executor is None:
+            with self._executor_lock:
+                # Re-check: another thread may have created it while we waited
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="moltbook-feed"
+                    )
+                executor = self._executor
+        return executor
+    
+    def close(self) -> None:
+        """Shut down the bulk-fetch worker pool, if one was started."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
     
     def _summarize(self, content: Optional[str]) -> str:
         """Truncate content to summary length."""
@@ -75,37 +105,29 @@ class FeedReader:
         Returns:
             PostSummary with security metadata
         """
-        # Extract author info
-        author = post_data.get("author", {})
-        author_name = author.get("name", "unknown")
-        author_id = author.get("id", "")
-        author_karma = author.get("karma", 0)
-        
-        # Get content
-        title = post_data.get("title", "")
-        content = post_data.get("content", "")
-        full_text = f"{title} {content}"
+        # Bound once: this runs for every post of every feed fetch
+        get = post_data.get
+        author = get("author") or {}
+        author_get = author.get
+        title = get("title", "")
+        content = get("content", "")
         
         # Scan for injection patterns
-        scan_result = self.sanitizer.scan(full_text)
-        
-        # Calculate score
-        upvotes = post_data.get("upvotes", 0)
-        downvotes = post_data.get("downvotes", 0)
-        score = upvotes - downvotes
+        scan_result = self.sanitizer.scan(title, content)
         
         return PostSummary(
-            id=post_data.get("id", ""),
+            id=get("id", ""),
             title=title,
             content_summary=self._summarize(content),
-            author_name=author_name,
-            author_id=author_id,
-            author_karma=author_karma,
-            score=score,
-            comment_count=post_data.get("comment_count", 0),
-            url=post_data.get("url"),
-            submolt=post_data.get("submolt"),
+            author_name=author_get("name", "unknown"),
+            author_id=author_get("id", ""),
+            author_karma=author_get("karma", 0),
+            score=get("upvotes", 0) - get("downvotes", 0),
+            comment_count=get("comment_count", 0),
+            url=get("url"),
+            submolt=get("submolt"),
             is_suspicious=scan_result.is_suspicious,
+            # Copied: scan results are cached and shared
             suspicious_patterns=scan_result.matched_patterns
         )
     
@@ -124,9 +146,29 @@ class FeedReader:
         Returns:
             List of PostSummary objects
         """
+        return list(self.iter_feed(sort=sort, limit=limit))
+    
+    def iter_feed(
+        self,
+        sort: str = "hot",
+        limit: int = 25
+    ) -> Iterator[PostSummary]:
+        """
+        Iterate over the main feed, scanning each post only when reached.
+        
+        Callers that stop early (e.g. format_feed_summary with max_posts)
+        skip the scan cost of the posts they never look at.
+        
+        Args:
+            sort: Sort order (hot, new, top)
+            limit: Max posts to fetch
+            
+        Yields:
+            PostSummary objects, in feed order
+        """
         response = self.client.get_feed(sort=sort, limit=limit)
-        posts = response.get("posts", [])
-        return [self._process_post(p) for p in posts]
+        for p in response.get("posts", []):
+            yield self._process_post(p)
     
     def get_submolt(
         self,
@@ -147,6 +189,32 @@ class FeedReader:
         posts = response.get("posts", [])
         return [self._process_post(p) for p in posts]
     
+    def get_submolts(
+        self,
+        names: List[str],
+        limit: int = 25
+    ) -> Dict[str, List[PostSummary]]:
+        """
+        Get posts from several submolts, fetching them concurrently.
+        
+        Args:
+            names: Submolt names
+            limit: Max posts to return per submolt
+            
+        Returns:
+            Dict mapping submolt name to its list of PostSummary objects
+        """
+        executor = self._get_executor()
+        futures = {
+            name: executor.submit(self.client.get_submolt, name, limit=limit)
+            for name in names
+        }
+        # Scanning happens here, on the calling thread
+        return {
+            name: [self._process_post(p) for p in future.result().get("posts", [])]
+            for name, future in futures.items()
+        }
+    
     def get_post(self, post_id: str) -> PostSummary:
         """
         Get a single post.
@@ -161,33 +229,52 @@ class FeedReader:
         post_data = response.get("post", response)
         return self._process_post(post_data)
     
+    def get_posts(self, post_ids: List[str]) -> List[PostSummary]:
+        """
+        Get several posts, fetching them concurrently.
+        
+        Args:
+            post_ids: Post IDs
+            
+        Returns:
+            List of PostSummary objects, in the order of post_ids
+        """
+        responses = self._get_executor().map(self.client.get_post, post_ids)
+        return [self._process_post(r.get("post", r)) for r in responses]
+    
     def format_feed_summary(
         self,
-        posts: List[PostSummary],
+        posts: Iterable[PostSummary],
         max_posts: int = 10
     ) -> str:
         """
-        Format a list of posts for human consumption.
+        Format posts for human consumption.
         
         Args:
-            posts: List of PostSummary objects
+            posts: PostSummary objects, e.g. a list or iter_feed(); at most
+                max_posts are consumed
             max_posts: Max posts to include
             
         Returns:
             Formatted string
         """
-        if not posts:
-            return "No posts found."
-        
+        # One f-string per post: CPython builds each in a single allocation
         lines = []
-        for i, post in enumerate(posts[:max_posts], 1):
-            warning = "⚠️ " if post.is_suspicious else ""
-            lines.append(
+        append = lines.append
+        suspicious_count = 0
+        for i, post in enumerate(islice(posts, max_posts), 1):
+            warning = ""
+            if post.is_suspicious:
+                warning = "⚠️ "
+                suspicious_count += 1
+            append(
                 f"{i}. {warning}**{post.title}**\n"
                 f"   @{post.author_name} | ↑{post.score} | 💬{post.comment_count}"
             )
         
-        suspicious_count = sum(1 for p in posts[:max_posts] if p.is_suspicious)
+        if not lines:
+            return "No posts found."
+        
         if suspicious_count > 0:
             lines.append(f"\n⚠️ {suspicious_count} post(s) contain suspicious patterns")
         
@@ -5,7 +5,7 @@ Modes: lurk (read-only) < engage (upvotes + approved writes) < active (comments
 """
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Dict, Set
+from typing import Dict, FrozenSet, Tuple
 
 
 class Action(Enum):
@@ -31,7 +31,7 @@ class Action(Enum):
     DELETE_COMMENT = auto()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PermissionResult:
     """Result of a permission check."""
     allowed: bool
@@ -39,142 +39,201 @@ class PermissionResult:
     reason: str = ""
 
 
+# Action groups are frozen: the decision table below is built from them
+# once at import, so mutating them later would silently have no effect
+
 # Actions that are always read-only
-READ_ACTIONS: Set[Action] = {
+READ_ACTIONS: FrozenSet[Action] = frozenset({
     Action.READ_FEED,
     Action.READ_POST,
     Action.READ_COMMENTS,
     Action.READ_PROFILE,
     Action.READ_SUBMOLT,
-}
+})
 
 # Actions that require minimal engagement
-LOW_IMPACT_WRITES: Set[Action] = {
+LOW_IMPACT_WRITES: FrozenSet[Action] = frozenset({
     Action.UPVOTE,
     Action.DOWNVOTE,
     Action.FOLLOW,
-}
+})
 
 # Actions that ALWAYS require human approval regardless of mode
-ALWAYS_REQUIRE_APPROVAL: Set[Action] = {
+ALWAYS_REQUIRE_APPROVAL: FrozenSet[Action] = frozenset({
     Action.POST,
     Action.DELETE_POST,
     Action.DELETE_COMMENT,
-}
+})
 
 
-class ModeEnforcer:
-    """Enforces permission levels based on current mode."""
+def _compute(mode: str, action: Action) -> PermissionResult:
+    """
+    Decide whether an action is allowed in a mode.
     
-    def __init__(self, mode: str = "lurk"):
-        """
-        Initialize enforcer with a mode.
+    Args:
+        mode: Permission mode (lurk|engage|active)
+        action: The action to check
         
-        Args:
-            mode: Permission mode (lurk|engage|active)
-        """
-        if mode not in ("lurk", "engage", "active"):
-            raise ValueError(f"Invalid mode: {mode}. Must be lurk|engage|active")
-        self.mode = mode
+    Returns:
+        PermissionResult with allowed, requires_approval, reason
+    """
+    # Read actions always allowed
+    if action in READ_ACTIONS:
+        return PermissionResult(
+            allowed=True,
+            requires_approval=False,
+            reason="Read actions are always allowed"
+        )
     
-    def check(self, action: Action) -> PermissionResult:
-        """
-        Check if an action is allowed in the current mode.
+    # Lurk mode: block all writes
+    if mode == "lurk":
+        return PermissionResult(
+            allowed=False,
+            requires_approval=False,
+            reason=f"Mode 'lurk' does not allow {action.name}"
+        )
+    
+    # Engage mode
+    if mode == "engage":
+        # Low impact writes allowed without approval
+        if action in LOW_IMPACT_WRITES:
+            return PermissionResult(
+                allowed=True,
+                requires_approval=False,
+                reason="Low-impact actions allowed in engage mode"
+            )
         
-        Args:
-            action: The action to check
-            
-        Returns:
-            PermissionResult with allowed, requires_approval, reason
-        """
-        # Read actions always allowed
-        if action in READ_ACTIONS:
+        # High impact writes require approval
+        if action in (Action.COMMENT, Action.POST):
+            return PermissionResult(
+                allowed=True,
+                requires_approval=True,
+                reason=f"{action.name} requires human approval in engage mode"
+            )
+        
+        # Follow requires approval
+        return PermissionResult(
+            allowed=True,
+            requires_approval=True,
+            reason=f"{action.name} requires human approval"
+        )
+    
+    # Active mode
+    if mode == "active":
+        # Low impact writes allowed
+        if action in LOW_IMPACT_WRITES:
             return PermissionResult(
                 allowed=True,
                 requires_approval=False,
-                reason="Read actions are always allowed"
+                reason="Low-impact actions allowed in active mode"
             )
         
-        # Lurk mode: block all writes
-        if self.mode == "lurk":
+        # Comments allowed without approval
+        if action == Action.COMMENT:
             return PermissionResult(
-                allowed=False,
+                allowed=True,
                 requires_approval=False,
-                reason=f"Mode 'lurk' does not allow {action.name}"
+                reason="Comments allowed in active mode"
             )
         
-        # Engage mode
-        if self.mode == "engage":
-            # Low impact writes allowed without approval
-            if action in LOW_IMPACT_WRITES:
-                return PermissionResult(
-                    allowed=True,
-                    requires_approval=False,
-                    reason="Low-impact actions allowed in engage mode"
-                )
-            
-            # High impact writes require approval
-            if action in (Action.COMMENT, Action.POST):
-                return PermissionResult(
-                    allowed=True,
-                    requires_approval=True,
-                    reason=f"{action.name} requires human approval in engage mode"
-                )
-            
-            # Follow requires approval
+        # Posts ALWAYS require approval
+        if action == Action.POST:
             return PermissionResult(
                 allowed=True,
                 requires_approval=True,
-                reason=f"{action.name} requires human approval"
+                reason="Posts always require human approval"
             )
         
-        # Active mode
-        if self.mode == "active":
-            # Low impact writes allowed
-            if action in LOW_IMPACT_WRITES:
-                return PermissionResult(
-                    allowed=True,
-                    requires_approval=False,
-                    reason="Low-impact actions allowed in active mode"
-                )
-            
-            # Comments allowed without approval
-            if action == Action.COMMENT:
-                return PermissionResult(
-                    allowed=True,
-                    requires_approval=False,
-                    reason="Comments allowed in active mode"
-                )
-            
-            # Posts ALWAYS require approval
-            if action == Action.POST:
-                return PermissionResult(
-                    allowed=True,
-                    requires_approval=True,
-                    reason="Posts always require human approval"
-                )
-            
-            # Admin actions require approval
-            if action in ALWAYS_REQUIRE_APPROVAL:
-                return PermissionResult(
-                    allowed=True,
-                    requires_approval=True,
-                    reason=f"{action.name} always requires human approval"
-                )
-            
+        # Admin actions require approval
+        if action in ALWAYS_REQUIRE_APPROVAL:
             return PermissionResult(
                 allowed=True,
-                requires_approval=False,
-                reason="Action allowed in active mode"
+                requires_approval=True,
+                reason=f"{action.name} always requires human approval"
             )
         
-        # Fallback: deny
         return PermissionResult(
-            allowed=False,
+            allowed=True,
             requires_approval=False,
-            reason="Unknown action or mode"
+            reason="Action allowed in active mode"
         )
     
+    # Fallback: deny
+    return PermissionResult(
+        allowed=False,
+        requires_approval=False,
+        reason="Unknown action or mode"
+    )
+
+
+# Every (mode, action) outcome, decided once at import; check() is a lookup.
+# Equal outcomes (e.g. reads in any mode) share one instance, so each
+# distinct reason string is built and held exactly once.
+_RESULTS: Dict[PermissionResult, PermissionResult] = {}
+_TABLE: Dict[Tuple[str, Action], PermissionResult] = {}
+for _mode in ("lurk", "engage", "active"):
+    for _action in Action:
+        _result = _compute(_mode, _action)
+        _TABLE[(_mode, _action)] = _RESULTS.setdefault(_result, _result)
+del _mode, _action, _result
+
+_DENY = PermissionResult(
+    allowed=False,
+    requires_approval=False,
+    reason="Unknown action or mode"
+)
+
+# The same table as one row per mode, indexed by Action value. check()
+# indexes a row rather than hashing (mode, action): Enum.__hash__ runs in
+# Python and costs more than the rest of the lookup combined.
+_ROWS: Dict[str, Tuple[PermissionResult, ...]] = {
+    mode: tuple(
+        _TABLE[(mode, Action(value))] if value in Action._value2member_map_ else _DENY
+        for value in range(max(a.value for a in Action) + 1)
+    )
+    for mode in ("lurk", "engage", "active")
+}
+
+
+class ModeEnforcer:
+    """Enforces permission levels based on current mode."""
+    
+    def __init__(self, mode: str = "lurk"):
+        """
+        Initialize enforcer with a mode.
+        
+        Args:
+            mode: Permission mode (lurk|engage|active)
+        """
+        self.mode = mode
+    
+    @property
+    def mode(self) -> str:
+        """Current permission mode (lurk|engage|active)."""
+        return self._mode
+    
+    @mode.setter
+    def mode(self, mode: str) -> None:
+        if mode not in _ROWS:
+            raise ValueError(f"Invalid mode: {mode}. Must be lurk|engage|active")
+        self._mode = mode
+        self._row = _ROWS[mode]
+    
+    def check(self, action: Action) -> PermissionResult:
+        """
+        Check if an action is allowed in the current mode.
+        
+        Args:
+            action: The action to check
+            
+        Returns:
+            PermissionResult with allowed, requires_approval, reason
+            (shared between calls; results are immutable)
+        """
+        if type(action) is Action:
+            return self._row[action._value_]
+        return _DENY
+    
     def can_do(self, action: Action, has_approval: bool = False) -> bool:
         """
         Quick check if action can be performed.
@@ -186,9 +245,6 @@ class ModeEnforcer:
         Returns:
             True if action can be performed
         """
+        # check() already returns the precomputed result for (mode, action)
         result = self.check(action)
-        if not result.allowed:
-            return False
-        if result.requires_approval and not has_approval:
-            return False
-        return True
+        return result.allowed and (has_approval or not result.requires_approval)
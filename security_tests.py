@@ -2,41 +2,72 @@
 # Run these to validate the sandbox is working
 
 import json
+import mmap
+import os
 import re
 
+# Where the skill keeps credentials on this machine
+CRED_PATH = "/Users/ariaserver/.config/moltbook/credentials.json"
+
+# Patterns checked by the prompt injection test, compiled once at import
+MALICIOUS_PATTERNS = [
+    r"ignore\s+(all\s+|your\s+|previous\s+)*instructions",
+    r"your human said",
+    r"execute (the following|this)",
+    r"system prompt",
+    r"ADMIN:",
+    r"<\|.*?\|>",  # Token markers
+    r"base64:",
+    r"eval\(",
+    r"import os",
+    r"subprocess",
+    r"__import__",
+    r"open\(['\"]\/",  # File access
+    r"curl .* \| (bash|sh)",
+    r"rm -rf",
+    r"MEMORY\.md",
+    r"api.?key",
+    r"credentials",
+]
+
+_COMPILED_PATTERNS = [re.compile(p, re.IGNORECASE) for p in MALICIOUS_PATTERNS]
+
+# All patterns fused into one alternation so content is walked once;
+# group p<i> is MALICIOUS_PATTERNS[i]
+_UNIFIED = re.compile(
+    "|".join(f"(?P<p{i}>{p})" for i, p in enumerate(MALICIOUS_PATTERNS)),
+    re.IGNORECASE
+)
+_GROUP_INDEX = {f"p{i}": i for i in range(len(MALICIOUS_PATTERNS))}
+
+# Bytes versions for ASCII content: bytes regexes skip Unicode case
+# folding. Non-ASCII content keeps the str ones, whose \s also matches
+# Unicode spaces (NBSP, em space, ...) used to pad injections.
+_COMPILED_PATTERNS_B = [re.compile(p.encode(), re.IGNORECASE) for p in MALICIOUS_PATTERNS]
+_UNIFIED_B = re.compile(_UNIFIED.pattern.encode(), re.IGNORECASE)
+
+
+def is_suspicious(content: str) -> list[str]:
+    """Return list of matched suspicious patterns"""
+    if content.isascii():
+        text, unified, compiled = content.encode("ascii"), _UNIFIED_B, _COMPILED_PATTERNS_B
+    else:
+        text, unified, compiled = content, _UNIFIED, _COMPILED_PATTERNS
+    
+    hits = {_GROUP_INDEX[m.lastgroup] for m in unified.finditer(text)}
+    if hits:
+        # finditer skips matches overlapping an earlier one; re-check the rest
+        hits.update(
+            i for i, p in enumerate(compiled)
+            if i not in hits and p.search(text)
+        )
+    return [MALICIOUS_PATTERNS[i] for i in sorted(hits)]
+
+
 # Test 1: Content sanitization
 def test_prompt_injection_detection():
     """Detect common prompt injection patterns in moltbook content"""
     
-    malicious_patterns = [
-        r"ignore\s+(all\s+|your\s+|previous\s+)*instructions",
-        r"your human said",
-        r"execute (the following|this)",
-        r"system prompt",
-        r"ADMIN:",
-        r"<\|.*?\|>",  # Token markers
-        r"base64:",
-        r"eval\(",
-        r"import os",
-        r"subprocess",
-        r"__import__",
-        r"open\(['\"]\/",  # File access
-        r"curl .* \| (bash|sh)",
-        r"rm -rf",
-        r"MEMORY\.md",
-        r"api.?key",
-        r"credentials",
-    ]
-    
-    def is_suspicious(content: str) -> list[str]:
-        """Return list of matched suspicious patterns"""
-        content_lower = content.lower()
-        matches = []
-        for pattern in malicious_patterns:
-            if re.search(pattern, content_lower, re.IGNORECASE):
-                matches.append(pattern)
-        return matches
-    
     # Test cases - (content, expected_to_be_flagged)
     test_cases = [
         ("Hello world!", False),
@@ -71,13 +102,14 @@ def test_prompt_injection_detection():
 def test_mode_enforcement():
     """Verify that lurk mode blocks write operations"""
     
-    # Load current mode
-    try:
-        with open("/Users/ariaserver/.config/moltbook/credentials.json") as f:
-            creds = json.load(f)
-            mode = creds.get("mode", "lurk")
-    except:
-        mode = "lurk"
+    # Load current mode (lurk when no credentials are configured)
+    mode = "lurk"
+    if os.path.exists(CRED_PATH):
+        try:
+            with open(CRED_PATH) as f:
+                mode = json.load(f).get("mode", "lurk")
+        except (OSError, json.JSONDecodeError):
+            pass  # unreadable or malformed: keep lurk
     
     print(f"\nTesting mode enforcement (current mode: {mode})...")
     
@@ -97,13 +129,31 @@ def test_mode_enforcement():
     
     return True
 
+# Byte strings whose presence in a file means an API key leaked there
+LEAK_MARKERS = (
+    b"moltbook_sk_",
+)
+
+# All markers in one alternation, so each file is walked once
+_LEAK_PATTERN = re.compile(b"|".join(re.escape(m) for m in LEAK_MARKERS))
+
+
+def _file_leaks_key(path: str) -> bool:
+    """Search a file for any leak marker via mmap, without reading it into memory"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False  # empty files cannot be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _LEAK_PATTERN.search(mm) is not None
+
+
 # Test 3: Credential isolation
 def test_credential_isolation():
     """Verify credentials are stored in isolated location"""
     
     print("\nTesting credential isolation...")
     
-    cred_path = "/Users/ariaserver/.config/moltbook/credentials.json"
+    cred_path = CRED_PATH
     bad_paths = [
         "/Users/ariaserver/clawd/MEMORY.md",
         "/Users/ariaserver/clawd/memory/",
@@ -111,33 +161,31 @@ def test_credential_isolation():
     ]
     
     # Check creds exist in correct location
+    if not os.path.exists(cred_path):
+        print(f"  ✗ Credentials not found at {cred_path}")
+        return False
     try:
         with open(cred_path) as f:
             creds = json.load(f)
-            has_key = "api_key" in creds
-            print(f"  ✓ Credentials in isolated location: {cred_path}")
-    except:
-        print(f"  ✗ Credentials not found at {cred_path}")
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"  ✗ Could not read credentials at {cred_path}: {e}")
         return False
+    has_key = "api_key" in creds
+    print(f"  ✓ Credentials in isolated location: {cred_path}")
     
     # Check creds NOT in bad locations
-    import os
     for bad_path in bad_paths:
         if os.path.isfile(bad_path):
-            with open(bad_path) as f:
-                content = f.read()
-                if "moltbook_sk_" in content:
-                    print(f"  ✗ API key leaked to: {bad_path}")
-                    return False
+            if _file_leaks_key(bad_path):
+                print(f"  ✗ API key leaked to: {bad_path}")
+                return False
         elif os.path.isdir(bad_path):
-            for fname in os.listdir(bad_path):
-                fpath = os.path.join(bad_path, fname)
-                if os.path.isfile(fpath):
-                    with open(fpath) as f:
-                        content = f.read()
-                        if "moltbook_sk_" in content:
-                            print(f"  ✗ API key leaked to: {fpath}")
-                            return False
+            # DirEntry carries the file type from the directory read
+            with os.scandir(bad_path) as entries:
+                for entry in entries:
+                    if entry.is_file() and _file_leaks_key(entry.path):
+                        print(f"  ✗ API key leaked to: {entry.path}")
+                        return False
     
     print(f"  ✓ API key not found in sensitive locations")
     return True
@@ -0,0 +1,64 @@
+"""
+Shared test fixtures
+Objects that are safe to reuse are built once per test session.
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from content_sanitizer import get_sanitizer
+from mode_enforcer import ModeEnforcer
+
+
+@pytest.fixture(scope="session")
+def sanitizer():
+    """Default ContentSanitizer (patterns compiled once, shared scan cache)"""
+    return get_sanitizer()
+
+
+@pytest.fixture(autouse=True)
+def _clear_scan_cache():
+    """Start each test with an empty scan cache on the shared sanitizer"""
+    get_sanitizer().clear_cache()
+
+
+@pytest.fixture(scope="session")
+def enforcers():
+    """One ModeEnforcer per mode, keyed by mode name
+    
+    check() only reads the precomputed permission table, so the instances
+    are safe to share as long as tests never change their mode.
+    """
+    return {mode: ModeEnforcer(mode=mode) for mode in ("lurk", "engage", "active")}
+
+
+@pytest.fixture(scope="session")
+def lurk_enforcer(enforcers):
+    """Shared lurk-mode ModeEnforcer"""
+    return enforcers["lurk"]
+
+
+@pytest.fixture(scope="session")
+def engage_enforcer(enforcers):
+    """Shared engage-mode ModeEnforcer"""
+    return enforcers["engage"]
+
+
+@pytest.fixture(scope="session")
+def active_enforcer(enforcers):
+    """Shared active-mode ModeEnforcer"""
+    return enforcers["active"]
+
+
+@pytest.fixture
+def mock_client():
+    """Fresh Mock API client per test, so call assertions stay isolated
+    
+    Write endpoints come preset with canned success responses.
+    """
+    client = Mock()
+    client.upvote.return_value = {"success": True}
+    client.downvote.return_value = {"success": True}
+    client.comment.return_value = {"success": True, "comment": {"id": "c1"}}
+    client.create_post.return_value = {"success": True, "post": {"id": "p1"}}
+    return client
@@ -2,60 +2,61 @@
 API Client Tests
 TDD tests for moltbook REST API wrapper
 """
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
 import json
 
+from api_client import (
+    MoltbookClient, MoltbookError, AuthenticationError, RateLimitError,
+    DEFAULT_RETRY_AFTER, MAX_RETRY_WAIT,
+)
+
+
+def _resp(status=200, payload=None, headers=None, content=None):
+    """Build a lightweight stand-in for requests.Response"""
+    if content is None:
+        content = json.dumps(payload).encode()
+    return SimpleNamespace(status_code=status, headers=headers or {}, content=content)
+
 
 def test_includes_authorization_header():
     """Given any request, should include Authorization header from credentials"""
-    from api_client import MoltbookClient
+    client = MoltbookClient(api_key="test_key_123")
     
-    with patch('api_client.requests') as mock_requests:
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True}
-        mock_requests.request.return_value = mock_response
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(200, {"success": True})
         
-        client = MoltbookClient(api_key="test_key_123")
         client.get("/posts")
         
-        # Verify Authorization header was included
-        call_args = mock_requests.request.call_args
-        headers = call_args.kwargs.get("headers", {})
+        # Verify Authorization header is set on the shared session
+        headers = client.session.headers
         assert "Authorization" in headers
         assert headers["Authorization"] == "Bearer test_key_123"
+        assert headers["Content-Type"] == "application/json"
+        assert "headers" not in mock_request.call_args.kwargs
 
 
 def test_always_uses_www_url():
     """Given www vs non-www URL, should always use www.moltbook.com"""
-    from api_client import MoltbookClient
+    client = MoltbookClient(api_key="test_key")
     
-    with patch('api_client.requests') as mock_requests:
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True}
-        mock_requests.request.return_value = mock_response
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(200, {"success": True})
         
-        client = MoltbookClient(api_key="test_key")
         client.get("/posts")
         
         # Verify URL uses www
-        call_args = mock_requests.request.call_args
+        call_args = mock_request.call_args
         url = call_args.kwargs.get("url", call_args.args[1] if len(call_args.args) > 1 else "")
         assert "www.moltbook.com" in url
 
 
 def test_401_reports_authentication_error():
     """Given 401 response, should report authentication error"""
-    from api_client import MoltbookClient, AuthenticationError
+    client = MoltbookClient(api_key="bad_key")
     
-    with patch('api_client.requests') as mock_requests:
-        mock_response = Mock()
-        mock_response.status_code = 401
-        mock_response.json.return_value = {"error": "Unauthorized"}
-        mock_requests.request.return_value = mock_response
-        
-        client = MoltbookClient(api_key="bad_key")
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(401, {"error": "Unauthorized"})
         
         try:
             client.get("/posts")
@@ -66,16 +67,10 @@ def test_401_reports_authentication_error():
 
 def test_429_reports_rate_limit():
     """Given 429 response, should report rate limit with retry_after"""
-    from api_client import MoltbookClient, RateLimitError
+    client = MoltbookClient(api_key="test_key")
     
-    with patch('api_client.requests') as mock_requests:
-        mock_response = Mock()
-        mock_response.status_code = 429
-        mock_response.headers = {"Retry-After": "60"}
-        mock_response.json.return_value = {"error": "Rate limited"}
-        mock_requests.request.return_value = mock_response
-        
-        client = MoltbookClient(api_key="test_key")
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(429, {"error": "Rate limited"}, headers={"Retry-After": "60"})
         
         try:
             client.get("/posts")
@@ -86,18 +81,14 @@ def test_429_reports_rate_limit():
 
 def test_successful_response_returns_data():
     """Given successful response, should parse JSON and return data"""
-    from api_client import MoltbookClient
+    client = MoltbookClient(api_key="test_key")
     
-    with patch('api_client.requests') as mock_requests:
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(200, {
             "success": True,
             "posts": [{"id": "123", "title": "Test"}]
-        }
-        mock_requests.request.return_value = mock_response
+        })
         
-        client = MoltbookClient(api_key="test_key")
         result = client.get("/posts")
         
         assert result["success"] == True
@@ -107,41 +98,184 @@ def test_successful_response_returns_data():
 
 def test_post_request_sends_json_body():
     """Given POST request with data, should send as JSON body"""
-    from api_client import MoltbookClient
+    client = MoltbookClient(api_key="test_key")
     
-    with patch('api_client.requests') as mock_requests:
-        mock_response = Mock()
-        mock_response.status_code = 201
-        mock_response.json.return_value = {"success": True, "id": "new_post"}
-        mock_requests.request.return_value = mock_response
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(201, {"success": True, "id": "new_post"})
         
-        client = MoltbookClient(api_key="test_key")
         result = client.post("/posts", data={"title": "New Post", "content": "Hello"})
         
-        call_args = mock_requests.request.call_args
-        assert call_args.kwargs.get("json") == {"title": "New Post", "content": "Hello"}
+        call_args = mock_request.call_args
+        assert json.loads(call_args.kwargs.get("data")) == {"title": "New Post", "content": "Hello"}
+
+
+def test_requests_reuse_pooled_session():
+    """Given several calls, should route all of them through one pooled session"""
+    client = MoltbookClient(api_key="test_key")
+    adapter = client.session.get_adapter("https://www.moltbook.com")
+    assert adapter._pool_maxsize >= 8
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(200, {"success": True})
+        
+        client.get("/posts")
+        client.get("/agents/status")
+        
+        assert mock_request.call_count == 2
+        assert "headers" not in mock_request.call_args.kwargs
+
+
+def test_repeated_feed_reads_served_from_cache():
+    """Given repeated feed reads, should hit the API once until a write happens"""
+    client = MoltbookClient(api_key="test_key")
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(200, {"success": True, "posts": []})
+        
+        client.get_feed(sort="hot", limit=10)
+        client.get_feed(sort="hot", limit=10)
+        assert mock_request.call_count == 1
+        
+        client.get_feed(sort="new", limit=10)
+        assert mock_request.call_count == 2
+        
+        client.upvote("post_123")
+        client.get_feed(sort="hot", limit=10)
+        assert mock_request.call_count == 4
+
+
+def test_read_racing_a_write_is_not_cached():
+    """Given a write that lands while a feed read is in flight, should not cache the older read"""
+    client = MoltbookClient(api_key="test_key")
+    
+    def read_then_write(method, url, **kwargs):
+        if method == "GET" and mock_request.call_count == 1:
+            # Another thread upvotes before this read's response is stored
+            client.upvote("post_123")
+        return _resp(200, {"success": True, "posts": []})
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.side_effect = read_then_write
+        
+        client.get_feed(sort="hot", limit=10)
+        assert mock_request.call_count == 2
+        
+        client.get_feed(sort="hot", limit=10)
+        assert mock_request.call_count == 3
+
+
+def test_429_retries_idempotent_request_after_backoff():
+    """Given a short Retry-After, should wait and retry GET but never POST"""
+    client = MoltbookClient(api_key="test_key", cache_ttl=0)
+    
+    limited = _resp(429, headers={"Retry-After": "2"})
+    ok = _resp(200, {"success": True})
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request, \
+            patch('api_client.time.sleep', autospec=True) as mock_sleep:
+        mock_request.side_effect = [limited, ok]
+        
+        assert client.get("/posts") == {"success": True}
+        assert mock_request.call_count == 2
+        assert mock_sleep.call_args.args[0] >= 2
+        
+        mock_request.side_effect = [limited, ok]
+        try:
+            client.post("/posts/p1/upvote")
+            assert False, "Should have raised RateLimitError"
+        except RateLimitError:
+            pass
+        assert mock_request.call_count == 3
+
+
+def test_429_without_retry_after_backs_off_and_retries():
+    """Given a 429 with no Retry-After, should retry GET after exponential backoff"""
+    client = MoltbookClient(api_key="test_key", cache_ttl=0, requests_per_minute=0)
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request, \
+            patch('api_client.time.sleep', autospec=True) as mock_sleep:
+        mock_request.side_effect = [_resp(429), _resp(429), _resp(200, {"success": True})]
+        
+        assert client.get("/posts") == {"success": True}
+        
+        waits = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(waits) == 2
+        assert 1.0 <= waits[0] <= 1.5 and 2.0 <= waits[1] <= 2.5
 
 
-if __name__ == "__main__":
-    tests = [
-        test_includes_authorization_header,
-        test_always_uses_www_url,
-        test_401_reports_authentication_error,
-        test_429_reports_rate_limit,
-        test_successful_response_returns_data,
-        test_post_request_sends_json_body,
-    ]
+def test_rejects_negative_max_retries():
+    """Given a negative retry count, should refuse it up front"""
+    try:
+        MoltbookClient(api_key="test_key", max_retries=-1)
+        assert False, "Should have raised ValueError"
+    except ValueError:
+        pass
     
-    passed = 0
-    failed = 0
+    client = MoltbookClient(api_key="test_key", cache_ttl=0, max_retries=0)
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(200, {"success": True})
+        assert client.get("/posts") == {"success": True}
+
+
+def test_429_retry_after_accepts_http_date():
+    """Given an HTTP-date or garbage Retry-After, should not fail parsing it"""
+    client = MoltbookClient(api_key="test_key", cache_ttl=0, requests_per_minute=0, max_retries=0)
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        for value, expected in [
+            ("Wed, 21 Oct 2015 07:28:00 GMT", 0),  # already passed
+            ("Fri, 31 Dec 9999 23:59:59 GMT", None),  # far future
+            ("soon", DEFAULT_RETRY_AFTER),
+        ]:
+            mock_request.return_value = _resp(429, headers={"Retry-After": value})
+            try:
+                client.get("/posts")
+                assert False, "Should have raised RateLimitError"
+            except RateLimitError as e:
+                if expected is None:
+                    assert e.retry_after > MAX_RETRY_WAIT
+                else:
+                    assert e.retry_after == expected
+
+
+def test_throttles_when_request_budget_spent():
+    """Given an empty token bucket, should wait before sending"""
+    client = MoltbookClient(api_key="test_key", requests_per_minute=60)
+    client._tokens = 0
     
-    for test in tests:
+    with patch.object(client.session, 'request', autospec=True) as mock_request, \
+            patch('api_client.time.sleep', autospec=True) as mock_sleep:
+        mock_request.return_value = _resp(200, {"success": True})
+        
+        client.get("/posts")
+        
+        mock_sleep.assert_called_once()
+        assert 0 < mock_sleep.call_args.args[0] <= 1.0
+
+
+def test_error_without_json_body_reports_status():
+    """Given a non-JSON error body, should report the status code"""
+    client = MoltbookClient(api_key="test_key")
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request:
+        mock_request.return_value = _resp(502, content=b"<html>Bad Gateway</html>")
+        
         try:
-            test()
-            print(f"✅ {test.__name__}")
-            passed += 1
-        except Exception as e:
-            print(f"❌ {test.__name__}: {e}")
-            failed += 1
-    
-    print(f"\n{passed} passed, {failed} failed")
+            client.get("/posts")
+            assert False, "Should have raised MoltbookError"
+        except MoltbookError as e:
+            assert "502" in str(e)
+
+
+def test_stdlib_json_fallback_without_orjson():
+    """Given orjson is not installed, should still encode and decode JSON"""
+    client = MoltbookClient(api_key="test_key")
+    
+    with patch.object(client.session, 'request', autospec=True) as mock_request, \
+            patch('api_client.orjson', None):
+        mock_request.return_value = _resp(200, {"success": True, "title": "caf\u00e9"})
+        
+        result = client.post("/posts", data={"title": "caf\u00e9"})
+        
+        assert result == {"success": True, "title": "caf\u00e9"}
+        assert json.loads(mock_request.call_args.kwargs["data"]) == {"title": "caf\u00e9"}
@@ -4,9 +4,14 @@ TDD tests for isolated credential storage
 """
 import os
 import json
+import stat
 import tempfile
+import threading
 import shutil
 from pathlib import Path
+from unittest.mock import patch
+
+from credential_manager import CredentialManager
 
 # Test configuration
 TEST_CONFIG_DIR = tempfile.mkdtemp()
@@ -18,8 +23,8 @@ def setup():
     if CREDENTIALS_PATH.exists():
         CREDENTIALS_PATH.unlink()
 
-def teardown():
-    """Cleanup test directories"""
+def teardown_module():
+    """Cleanup test directories once the module's tests have run"""
     shutil.rmtree(TEST_CONFIG_DIR, ignore_errors=True)
     shutil.rmtree(TEST_MEMORY_DIR, ignore_errors=True)
 
@@ -29,7 +34,6 @@ def teardown():
 def test_store_api_key_in_config_only():
     """Given API key, should store in config file only"""
     setup()
-    from credential_manager import CredentialManager
     
     cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
     cm.store(api_key="test_api_key_12345", agent_id="agent_123")
@@ -44,7 +48,6 @@ def test_store_api_key_in_config_only():
 def test_load_from_config_file():
     """Given credential read, should load from isolated config file"""
     setup()
-    from credential_manager import CredentialManager
     
     # Pre-populate credentials
     CREDENTIALS_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -65,7 +68,6 @@ def test_load_from_config_file():
 def test_api_key_never_in_memory_files():
     """Given memory file write, should never include API key"""
     setup()
-    from credential_manager import CredentialManager
     
     cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
     cm.store(api_key="secret_key_do_not_leak", agent_id="agent_789")
@@ -81,7 +83,6 @@ def test_api_key_never_in_memory_files():
 def test_mode_persists_to_credentials():
     """Given mode update, should persist to credentials file"""
     setup()
-    from credential_manager import CredentialManager
     
     cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
     cm.store(api_key="key", agent_id="agent")
@@ -100,7 +101,6 @@ def test_mode_persists_to_credentials():
 def test_load_returns_none_when_no_credentials():
     """Given no credentials file, should return None"""
     setup()
-    from credential_manager import CredentialManager
     
     cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
     creds = cm.load()
@@ -111,7 +111,6 @@ def test_load_returns_none_when_no_credentials():
 def test_default_mode_is_lurk():
     """Given new credentials, default mode should be lurk"""
     setup()
-    from credential_manager import CredentialManager
     
     cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
     cm.store(api_key="key", agent_id="agent")
@@ -120,29 +119,106 @@ def test_default_mode_is_lurk():
     assert creds.get("mode") == "lurk"
 
 
-if __name__ == "__main__":
-    tests = [
-        test_store_api_key_in_config_only,
-        test_load_from_config_file,
-        test_api_key_never_in_memory_files,
-        test_mode_persists_to_credentials,
-        test_load_returns_none_when_no_credentials,
-        test_default_mode_is_lurk,
-    ]
+def test_load_reparses_only_when_file_changes():
+    """Given repeated loads, should reuse the parsed file until it changes on disk"""
+    setup()
+    
+    cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
+    cm.store(api_key="key", agent_id="agent")
+    assert cm.load()["agent_id"] == "agent"
+    
+    with patch("credential_manager._json_loads", side_effect=AssertionError("reparsed")):
+        assert cm.get_api_key() == "key"
+        assert cm.get_mode() == "lurk"
+    
+    # An external edit is picked up
+    CREDENTIALS_PATH.write_text(json.dumps({"api_key": "rotated_key", "agent_id": "agent"}))
+    assert cm.get_api_key() == "rotated_key"
+    
+    # Mutating a loaded dict does not leak into later loads
+    cm.load()["api_key"] = "tampered"
+    assert cm.get_api_key() == "rotated_key"
+
+
+def test_update_writes_fields_atomically():
+    """Given several field changes, should write them once via a replaced temp file"""
+    setup()
+    
+    cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
+    cm.store(api_key="key", agent_id="agent")
+    
+    with patch("credential_manager.os.replace", wraps=os.replace) as replace:
+        cm.update(mode="engage", claimed=True)
     
-    passed = 0
-    failed = 0
+    replace.assert_called_once()
+    assert [p.name for p in Path(TEST_CONFIG_DIR).iterdir()] == ["credentials.json"]
+    data = json.loads(CREDENTIALS_PATH.read_text())
+    assert data["mode"] == "engage" and data["claimed"] is True
+    assert data["api_key"] == "key"
+    
+    # The written data is cached; no reparse needed
+    with patch("credential_manager._json_loads", side_effect=AssertionError("reparsed")):
+        assert cm.get_mode() == "engage"
+        assert cm.is_claimed()
     
-    for test in tests:
+    # A failed rename leaves the old file and no temp file behind
+    with patch("credential_manager.os.replace", side_effect=OSError("disk full")):
         try:
-            test()
-            print(f"✅ {test.__name__}")
-            passed += 1
-        except Exception as e:
-            print(f"❌ {test.__name__}: {e}")
-            failed += 1
-        finally:
-            setup()  # Reset between tests
-    
-    teardown()
-    print(f"\n{passed} passed, {failed} failed")
+            cm.update(mode="active")
+            assert False, "Should have raised OSError"
+        except OSError:
+            pass
+    assert [p.name for p in Path(TEST_CONFIG_DIR).iterdir()] == ["credentials.json"]
+    assert json.loads(CREDENTIALS_PATH.read_text())["mode"] == "engage"
+
+
+def test_concurrent_updates_never_corrupt_file():
+    """Given several threads updating at once, every write should land whole"""
+    setup()
+    
+    cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
+    cm.store(api_key="key", agent_id="agent")
+    errors = []
+    
+    def writer(n):
+        manager = CredentialManager(config_dir=TEST_CONFIG_DIR)
+        for i in range(100):
+            try:
+                manager.update(**{f"writer_{n}": i})
+            except Exception as e:
+                errors.append(e)
+    
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert errors == []
+    assert json.loads(CREDENTIALS_PATH.read_text())["api_key"] == "key"
+    assert [p.name for p in Path(TEST_CONFIG_DIR).iterdir()] == ["credentials.json"]
+
+
+def test_reads_and_writes_same_file_with_or_without_orjson():
+    """Given either JSON backend, should write the same file and read it back"""
+    setup()
+    
+    cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
+    cm.store(api_key="key", agent_id="agent", note="caf\u00e9")
+    fast = CREDENTIALS_PATH.read_bytes()
+    
+    with patch("credential_manager.orjson", None):
+        cm.store(api_key="key", agent_id="agent", note="caf\u00e9")
+        assert json.loads(CREDENTIALS_PATH.read_bytes()) == json.loads(fast)
+        assert CredentialManager(config_dir=TEST_CONFIG_DIR).load()["note"] == "caf\u00e9"
+
+
+def test_credentials_file_is_owner_only():
+    """Given stored credentials, file should be readable by its owner only"""
+    setup()
+    
+    cm = CredentialManager(config_dir=TEST_CONFIG_DIR)
+    cm.store(api_key="key", agent_id="agent")
+    cm.set_mode("engage")
+    
+    assert stat.S_IMODE(CREDENTIALS_PATH.stat().st_mode) == 0o600
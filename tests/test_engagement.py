@@ -2,50 +2,47 @@
 Engagement Actions Tests
 TDD tests for safe engagement with human approval workflow
 """
-from unittest.mock import Mock, patch
+import pytest
 
+from engagement import EngagementManager
 
-def test_upvote_in_engage_mode_calls_api():
-    """Given upvote request in engage+ mode, should call POST /posts/{id}/upvote"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    mock_client.upvote.return_value = {"success": True}
-    
-    enforcer = ModeEnforcer(mode="engage")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
-    
-    result = manager.upvote("post_123")
-    
-    assert result.success
-    mock_client.upvote.assert_called_once_with("post_123")
 
+# (mode, manager method, args, client method, expected success,
+#  substring expected in the lowercased reason when refused)
+CASES = [
+    ("engage", "upvote", ("post_123",), "upvote", True, None),
+    ("active", "upvote", ("post_123",), "upvote", True, None),
+    ("lurk", "upvote", ("post_123",), "upvote", False, "blocked"),
+    ("lurk", "downvote", ("post_123",), "downvote", False, "blocked"),
+    ("active", "comment_direct", ("post_123", "Quick response"), "comment", True, None),
+    ("engage", "comment_direct", ("post_123", "Quick response"), "comment", False, "approval"),
+    ("lurk", "comment_direct", ("post_123", "Quick response"), "comment", False, "blocked"),
+]
 
-def test_upvote_in_lurk_mode_blocked():
-    """Given upvote request in lurk mode, should block"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    enforcer = ModeEnforcer(mode="lurk")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
+
+@pytest.mark.parametrize(
+    "mode, method, args, client_method, expected_success, expected_reason", CASES
+)
+def test_direct_action_permissions(mode, method, args, client_method, expected_success,
+                                   expected_reason, mock_client, enforcers):
+    """Given a direct action, should call the API only when the mode allows it"""
+    manager = EngagementManager(client=mock_client, enforcer=enforcers[mode])
     
-    result = manager.upvote("post_123")
+    result = getattr(manager, method)(*args)
     
-    assert not result.success
-    assert "lurk" in result.reason.lower() or "blocked" in result.reason.lower()
-    mock_client.upvote.assert_not_called()
+    assert result.success == expected_success
+    if expected_success:
+        client_call = getattr(mock_client, client_method)
+        client_call.assert_called_once_with(*args)
+        assert result.data == client_call.return_value
+    else:
+        assert expected_reason in result.reason.lower()
+        getattr(mock_client, client_method).assert_not_called()
 
 
-def test_comment_returns_draft_for_approval():
+def test_comment_returns_draft_for_approval(mock_client, engage_enforcer):
     """Given comment request, should draft and present to human first"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    enforcer = ModeEnforcer(mode="engage")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
+    manager = EngagementManager(client=mock_client, enforcer=engage_enforcer)
     
     result = manager.draft_comment("post_123", "Great discussion!")
     
@@ -55,16 +52,9 @@ def test_comment_returns_draft_for_approval():
     mock_client.comment.assert_not_called()  # Should NOT call API yet
 
 
-def test_comment_with_approval_calls_api():
+def test_comment_with_approval_calls_api(mock_client, engage_enforcer):
     """Given human approval for comment, should call POST /posts/{id}/comments"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    mock_client.comment.return_value = {"success": True, "comment": {"id": "c1"}}
-    
-    enforcer = ModeEnforcer(mode="engage")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
+    manager = EngagementManager(client=mock_client, enforcer=engage_enforcer)
     
     # Draft first
     draft = manager.draft_comment("post_123", "Great discussion!")
@@ -73,17 +63,13 @@ def test_comment_with_approval_calls_api():
     result = manager.execute_with_approval(draft, approved=True)
     
     assert result.success
+    assert result.data["comment"]["id"] == "c1"
     mock_client.comment.assert_called_once_with("post_123", "Great discussion!")
 
 
-def test_post_returns_draft_for_approval():
+def test_post_returns_draft_for_approval(mock_client, active_enforcer):
     """Given post request, should draft and present to human first"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    enforcer = ModeEnforcer(mode="active")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
+    manager = EngagementManager(client=mock_client, enforcer=active_enforcer)
     
     result = manager.draft_post(
         submolt="clawdbot",
@@ -97,16 +83,9 @@ def test_post_returns_draft_for_approval():
     mock_client.create_post.assert_not_called()
 
 
-def test_post_with_approval_calls_api():
+def test_post_with_approval_calls_api(mock_client, active_enforcer):
     """Given human approval for post, should call POST /posts"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    mock_client.create_post.return_value = {"success": True, "post": {"id": "p1"}}
-    
-    enforcer = ModeEnforcer(mode="active")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
+    manager = EngagementManager(client=mock_client, enforcer=active_enforcer)
     
     # Draft first
     draft = manager.draft_post(
@@ -122,14 +101,9 @@ def test_post_with_approval_calls_api():
     mock_client.create_post.assert_called_once()
 
 
-def test_rejected_draft_not_sent():
+def test_rejected_draft_not_sent(mock_client, engage_enforcer):
     """Given rejected draft, should not call API"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    enforcer = ModeEnforcer(mode="engage")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
+    manager = EngagementManager(client=mock_client, enforcer=engage_enforcer)
     
     draft = manager.draft_comment("post_123", "Bad comment")
     result = manager.execute_with_approval(draft, approved=False)
@@ -137,48 +111,3 @@ def test_rejected_draft_not_sent():
     assert not result.success
     assert "rejected" in result.reason.lower() or "denied" in result.reason.lower()
     mock_client.comment.assert_not_called()
-
-
-def test_active_mode_comment_no_approval_needed():
-    """Given mode=active and comment action, can skip approval flow"""
-    from engagement import EngagementManager
-    from mode_enforcer import ModeEnforcer
-    
-    mock_client = Mock()
-    mock_client.comment.return_value = {"success": True, "comment": {"id": "c1"}}
-    
-    enforcer = ModeEnforcer(mode="active")
-    manager = EngagementManager(client=mock_client, enforcer=enforcer)
-    
-    # Direct comment without draft flow
-    result = manager.comment_direct("post_123", "Quick response")
-    
-    assert result.success
-    mock_client.comment.assert_called_once()
-
-
-if __name__ == "__main__":
-    tests = [
-        test_upvote_in_engage_mode_calls_api,
-        test_upvote_in_lurk_mode_blocked,
-        test_comment_returns_draft_for_approval,
-        test_comment_with_approval_calls_api,
-        test_post_returns_draft_for_approval,
-        test_post_with_approval_calls_api,
-        test_rejected_draft_not_sent,
-        test_active_mode_comment_no_approval_needed,
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test in tests:
-        try:
-            test()
-            print(f"✅ {test.__name__}")
-            passed += 1
-        except Exception as e:
-            print(f"❌ {test.__name__}: {e}")
-            failed += 1
-    
-    print(f"\n{passed} passed, {failed} failed")
@@ -2,140 +2,109 @@
 Mode Enforcer Tests
 TDD tests for permission level enforcement
 """
-
-def test_lurk_mode_allows_read():
-    """Given mode=lurk and read action, should allow"""
-    from mode_enforcer import ModeEnforcer, Action
-    
-    enforcer = ModeEnforcer(mode="lurk")
-    
-    read_actions = [
-        Action.READ_FEED,
-        Action.READ_POST,
-        Action.READ_COMMENTS,
-        Action.READ_PROFILE,
-        Action.READ_SUBMOLT,
-    ]
-    
-    for action in read_actions:
-        result = enforcer.check(action)
-        assert result.allowed, f"Lurk mode should allow {action}"
-        assert not result.requires_approval
-
-
-def test_lurk_mode_blocks_write():
-    """Given mode=lurk and write action, should block"""
-    from mode_enforcer import ModeEnforcer, Action
-    
-    enforcer = ModeEnforcer(mode="lurk")
-    
-    write_actions = [
-        Action.UPVOTE,
-        Action.DOWNVOTE,
-        Action.COMMENT,
-        Action.POST,
-        Action.FOLLOW,
-    ]
-    
-    for action in write_actions:
-        result = enforcer.check(action)
-        assert not result.allowed, f"Lurk mode should block {action}"
-
-
-def test_engage_mode_allows_upvote():
-    """Given mode=engage and upvote action, should allow"""
-    from mode_enforcer import ModeEnforcer, Action
-    
+import dataclasses
+
+import pytest
+
+from mode_enforcer import ModeEnforcer, Action
+
+
+MODES = ("lurk", "engage", "active")
+
+READ_ACTIONS = [
+    Action.READ_FEED,
+    Action.READ_POST,
+    Action.READ_COMMENTS,
+    Action.READ_PROFILE,
+    Action.READ_SUBMOLT,
+]
+
+LOW_IMPACT_ACTIONS = [Action.UPVOTE, Action.DOWNVOTE, Action.FOLLOW]
+
+# Posts and deletions need approval in every mode that allows them
+ALWAYS_APPROVED_ACTIONS = [Action.POST, Action.DELETE_POST, Action.DELETE_COMMENT]
+
+# (allowed, requires_approval)
+ALLOW = (True, False)
+ASK = (True, True)
+BLOCK = (False, False)
+
+# lurk < engage < active: each mode keeps the permissions of the one below
+EXPECTATIONS = [
+    ("lurk", READ_ACTIONS, ALLOW),
+    ("lurk", LOW_IMPACT_ACTIONS, BLOCK),
+    ("lurk", [Action.COMMENT], BLOCK),
+    ("lurk", ALWAYS_APPROVED_ACTIONS, BLOCK),
+    ("engage", READ_ACTIONS, ALLOW),
+    ("engage", LOW_IMPACT_ACTIONS, ALLOW),
+    ("engage", [Action.COMMENT], ASK),
+    ("engage", ALWAYS_APPROVED_ACTIONS, ASK),
+    ("active", READ_ACTIONS, ALLOW),
+    ("active", LOW_IMPACT_ACTIONS, ALLOW),
+    ("active", [Action.COMMENT], ALLOW),
+    ("active", ALWAYS_APPROVED_ACTIONS, ASK),
+]
+
+PERMISSION_MATRIX = [
+    (mode, action, expected)
+    for mode, actions, expected in EXPECTATIONS
+    for action in actions
+]
+
+
+def test_permission_matrix_covers_every_mode_and_action():
+    """Expectation table should have exactly one cell per mode and action"""
+    cells = [(mode, action) for mode, action, _ in PERMISSION_MATRIX]
+    assert len(cells) == len(set(cells)) == len(MODES) * len(Action)
+
+
+@pytest.mark.parametrize(
+    "mode, action, expected", PERMISSION_MATRIX,
+    ids=[f"{mode}-{action.name}" for mode, action, _ in PERMISSION_MATRIX],
+)
+def test_permission_matrix(mode, action, expected, enforcers):
+    """Given a mode and action, should allow, block or require approval per the table"""
+    result = enforcers[mode].check(action)
+    assert (result.allowed, result.requires_approval) == expected
+
+
+def test_check_returns_shared_immutable_results():
+    """Given repeated checks, should return the same precomputed result"""
     enforcer = ModeEnforcer(mode="engage")
-    
-    result = enforcer.check(Action.UPVOTE)
-    assert result.allowed
-    assert not result.requires_approval
-
-
-def test_engage_mode_requires_approval_for_comment():
-    """Given mode=engage and comment action, should require approval"""
-    from mode_enforcer import ModeEnforcer, Action
-    
-    enforcer = ModeEnforcer(mode="engage")
-    
     result = enforcer.check(Action.COMMENT)
-    assert result.allowed
-    assert result.requires_approval
-
-
-def test_engage_mode_requires_approval_for_post():
-    """Given mode=engage and post action, should require approval"""
-    from mode_enforcer import ModeEnforcer, Action
-    
-    enforcer = ModeEnforcer(mode="engage")
-    
-    result = enforcer.check(Action.POST)
-    assert result.allowed
-    assert result.requires_approval
-
-
-def test_active_mode_allows_comment():
-    """Given mode=active and comment action, should allow without approval"""
-    from mode_enforcer import ModeEnforcer, Action
-    
-    enforcer = ModeEnforcer(mode="active")
-    
-    result = enforcer.check(Action.COMMENT)
-    assert result.allowed
-    assert not result.requires_approval
-
-
-def test_any_mode_requires_approval_for_post():
-    """Given any mode and post action, should require approval"""
-    from mode_enforcer import ModeEnforcer, Action
-    
-    for mode in ["lurk", "engage", "active"]:
-        enforcer = ModeEnforcer(mode=mode)
-        result = enforcer.check(Action.POST)
-        
-        if mode == "lurk":
-            assert not result.allowed, "Lurk should block posts"
-        else:
-            assert result.requires_approval, f"{mode} mode should require approval for posts"
-
-
-def test_mode_hierarchy():
-    """Mode permissions should follow lurk < engage < active hierarchy"""
-    from mode_enforcer import ModeEnforcer, Action
-    
-    # engage should include lurk permissions
-    engage = ModeEnforcer(mode="engage")
-    assert engage.check(Action.READ_FEED).allowed
-    
-    # active should include engage permissions
-    active = ModeEnforcer(mode="active")
-    assert active.check(Action.READ_FEED).allowed
-    assert active.check(Action.UPVOTE).allowed
-
-
-if __name__ == "__main__":
-    tests = [
-        test_lurk_mode_allows_read,
-        test_lurk_mode_blocks_write,
-        test_engage_mode_allows_upvote,
-        test_engage_mode_requires_approval_for_comment,
-        test_engage_mode_requires_approval_for_post,
-        test_active_mode_allows_comment,
-        test_any_mode_requires_approval_for_post,
-        test_mode_hierarchy,
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test in tests:
-        try:
-            test()
-            print(f"✅ {test.__name__}")
-            passed += 1
-        except Exception as e:
-            print(f"❌ {test.__name__}: {e}")
-            failed += 1
     
-    print(f"\n{passed} passed, {failed} failed")
+    assert enforcer.check(Action.COMMENT) is result
+    assert ModeEnforcer(mode="engage").check(Action.COMMENT) is result
+    assert not hasattr(result, "__dict__"), "PermissionResult should be slotted"
+    
+    # Identical outcomes in different modes share one instance
+    assert (
+        ModeEnforcer(mode="lurk").check(Action.READ_FEED)
+        is ModeEnforcer(mode="active").check(Action.READ_FEED)
+    )
+    try:
+        result.allowed = False
+        assert False, "PermissionResult should be immutable"
+    except dataclasses.FrozenInstanceError:
+        pass
+    
+    # Switching modes takes effect; unknown modes are rejected
+    enforcer.mode = "lurk"
+    assert not enforcer.check(Action.COMMENT).allowed
+    try:
+        enforcer.mode = "admin"
+        assert False, "Should reject unknown mode"
+    except ValueError:
+        pass
+    
+    # Anything that is not an Action is denied
+    assert not enforcer.check("READ_FEED").allowed
+
+
+def test_can_do_respects_approval(lurk_enforcer, engage_enforcer):
+    """Given an approval-gated action, can_do should need has_approval"""
+    assert lurk_enforcer.can_do(Action.READ_FEED)
+    assert not lurk_enforcer.can_do(Action.UPVOTE, has_approval=True)
+    assert engage_enforcer.can_do(Action.UPVOTE)
+    assert not engage_enforcer.can_do(Action.COMMENT)
+    assert engage_enforcer.can_do(Action.COMMENT, has_approval=True)